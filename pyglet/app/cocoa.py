@@ -42,6 +42,11 @@ __version__ = '$Id: $'
 from pyglet.app.base import PlatformEventLoop
 from pyglet.libs.darwin import *
 
+try:
+    from CoreFoundation import CFRunLoopGetMain, CFRunLoopWakeUp
+except ImportError:
+    CFRunLoopGetMain = CFRunLoopWakeUp = None
+
 class CocoaEventLoop(PlatformEventLoop):
 
     def __init__(self):
@@ -81,59 +86,74 @@ class CocoaEventLoop(PlatformEventLoop):
         pass
 
     def step(self, timeout=None):
-        # Create an autorelease pool for this iteration.
+        # Create an autorelease pool scoped to this iteration, so objects
+        # autoreleased while dispatching are reclaimed every step rather
+        # than accumulating for the lifetime of the application.  The
+        # try/finally guarantees the pool is destroyed even if an event
+        # handler raises.
         pool = NSAutoreleasePool.alloc().init()
-
-        # Determine the timeout date.
-        if timeout is None:
-            # Using distantFuture as untilDate means that nextEventMatchingMask
-            # will wait until the next event comes along.
-            timeout_date = NSDate.distantFuture()
-        else:
-            timeout_date = NSDate.dateWithTimeIntervalSinceNow_(timeout)
-
-        # Retrieve the next event (if any).  We wait for an event to show up
-        # and then process it, or if timeout_date expires we simply return.
-        # We only process one event per call of step().
-        self._is_running.set()
-        event = NSApp().nextEventMatchingMask_untilDate_inMode_dequeue_(
-                NSAnyEventMask, timeout_date, NSDefaultRunLoopMode, True)
-
-        # Dispatch the event (if any).
-        if event is not None:
-            event_type = event.type()
-            if event_type != NSApplicationDefined:
-                # Send out event as normal.  Responders will still receive 
-                # keyUp:, keyDown:, and flagsChanged: events.
-                NSApp().sendEvent_(event)
-
-                # Resend key events as special pyglet-specific messages
-                # which supplant the keyDown:, keyUp:, and flagsChanged: messages
-                # because NSApplication translates multiple key presses into key 
-                # equivalents before sending them on, which means that some keyUp:
-                # messages are never sent for individual keys.   Our pyglet-specific
-                # replacements ensure that we see all the raw key presses & releases.
-                # We also filter out key-down repeats since pyglet only sends one
-                # on_key_press event per key press.
-                if event_type == NSKeyDown and not event.isARepeat():
-                    NSApp().sendAction_to_from_("pygletKeyDown:", None, event)
-                elif event_type == NSKeyUp:
-                    NSApp().sendAction_to_from_("pygletKeyUp:", None, event)
-                elif event_type == NSFlagsChanged:
-                    NSApp().sendAction_to_from_("pygletFlagsChanged:", None, event)
-
-            NSApp().updateWindows()
-            did_time_out = False
-        else:
-            did_time_out = True
-
-        self._is_running.clear()
-
-        # Destroy the autorelease pool used for this step.
-        del pool
+        try:
+            # Determine the timeout date.
+            if timeout is None:
+                # Using distantFuture as untilDate means that
+                # nextEventMatchingMask will wait until the next event
+                # comes along.
+                timeout_date = NSDate.distantFuture()
+            else:
+                timeout_date = NSDate.dateWithTimeIntervalSinceNow_(timeout)
+
+            # Retrieve the next event (if any).  We wait for an event to
+            # show up and then process it, or if timeout_date expires we
+            # simply return.
+            self._is_running.set()
+            event = NSApp().nextEventMatchingMask_untilDate_inMode_dequeue_(
+                    NSAnyEventMask, timeout_date, NSDefaultRunLoopMode, True)
+
+            # Once the first event has arrived, drain everything else
+            # already queued so a burst of events costs one step() instead
+            # of a full run-loop round trip per event.
+            did_time_out = event is None
+            while event is not None:
+                self._dispatch_event(event)
+                event = \
+                    NSApp().nextEventMatchingMask_untilDate_inMode_dequeue_(
+                        NSAnyEventMask, NSDate.distantPast(),
+                        NSDefaultRunLoopMode, True)
+
+            if not did_time_out:
+                NSApp().updateWindows()
+
+            self._is_running.clear()
+        finally:
+            # Destroy the autorelease pool used for this step.
+            del pool
 
         return did_time_out
-    
+
+    def _dispatch_event(self, event):
+        event_type = event.type()
+        if event_type == NSApplicationDefined:
+            return
+
+        # Send out event as normal.  Responders will still receive
+        # keyUp:, keyDown:, and flagsChanged: events.
+        NSApp().sendEvent_(event)
+
+        # Resend key events as special pyglet-specific messages
+        # which supplant the keyDown:, keyUp:, and flagsChanged: messages
+        # because NSApplication translates multiple key presses into key
+        # equivalents before sending them on, which means that some keyUp:
+        # messages are never sent for individual keys.   Our pyglet-specific
+        # replacements ensure that we see all the raw key presses & releases.
+        # We also filter out key-down repeats since pyglet only sends one
+        # on_key_press event per key press.
+        if event_type == NSKeyDown and not event.isARepeat():
+            NSApp().sendAction_to_from_("pygletKeyDown:", None, event)
+        elif event_type == NSKeyUp:
+            NSApp().sendAction_to_from_("pygletKeyUp:", None, event)
+        elif event_type == NSFlagsChanged:
+            NSApp().sendAction_to_from_("pygletFlagsChanged:", None, event)
+
     def stop(self):
         pass
 
@@ -151,4 +171,9 @@ class CocoaEventLoop(PlatformEventLoop):
                     0,                    # data2
                     )
         NSApp().postEvent_atStart_(notifyEvent, False)
+        # Posting the event alone does not interrupt a run loop blocked in
+        # another mode (e.g. event tracking); explicitly wake the main
+        # CFRunLoop so cross-thread notify() takes effect immediately.
+        if CFRunLoopWakeUp is not None:
+            CFRunLoopWakeUp(CFRunLoopGetMain())
         del pool
@@ -144,6 +144,11 @@ __version__ = '$Id$'
 import time
 import sys
 import ctypes
+import heapq
+import itertools
+
+from collections import deque
+from functools import partial
 
 import pyglet.lib
 
@@ -152,10 +157,38 @@ if sys.platform in ('win32', 'cygwin'):
     # use a waitable timer object, which has up to 100-nanosecond resolution
     # (hardware and implementation dependent, of course).
     _kernel32 = ctypes.windll.kernel32
+
+    # CreateWaitableTimerExW flags and access mask, from winbase.h.  The
+    # high-resolution flag (Windows 10 1803+) gives sub-millisecond wakes
+    # without globally raising the timer interrupt frequency via
+    # timeBeginPeriod.
+    _CREATE_WAITABLE_TIMER_MANUAL_RESET = 0x00000001
+    _CREATE_WAITABLE_TIMER_HIGH_RESOLUTION = 0x00000002
+    _TIMER_ALL_ACCESS = 0x001f0003
+
     class _ClockBase(object):
         def __init__(self):
-            self._timer = _kernel32.CreateWaitableTimerA(ctypes.c_void_p(), 
-                True, ctypes.c_void_p())
+            self._timer = None
+            try:
+                CreateWaitableTimerExW = _kernel32.CreateWaitableTimerExW
+            except AttributeError:
+                # Pre-Vista kernel32 doesn't export the Ex variant.
+                pass
+            else:
+                # restype must be declared, otherwise the handle is
+                # truncated to 32 bits on 64-bit Python.
+                CreateWaitableTimerExW.restype = ctypes.c_void_p
+                self._timer = CreateWaitableTimerExW(
+                    ctypes.c_void_p(), ctypes.c_void_p(),
+                    _CREATE_WAITABLE_TIMER_MANUAL_RESET |
+                        _CREATE_WAITABLE_TIMER_HIGH_RESOLUTION,
+                    _TIMER_ALL_ACCESS)
+            if not self._timer:
+                # High-resolution timers unsupported (or older Windows);
+                # fall back to the standard timer, bounded by the system
+                # tick.
+                self._timer = _kernel32.CreateWaitableTimerA(
+                    ctypes.c_void_p(), True, ctypes.c_void_p())
 
         def sleep(self, microseconds):
             delay = ctypes.c_longlong(int(-microseconds * 10))
@@ -163,28 +196,90 @@ if sys.platform in ('win32', 'cygwin'):
                 0, ctypes.c_void_p(), ctypes.c_void_p(), False)
             _kernel32.WaitForSingleObject(self._timer, 0xffffffff)
 
-    _default_time_function = time.clock
+    # Prefer the monotonic, high-resolution perf_counter where available
+    # (Python 3.3+); it is immune to NTP adjustments which otherwise show
+    # up as negative or wildly large deltas.
+    _default_time_function = getattr(time, 'perf_counter', time.clock)
 
 else:
     _c = pyglet.lib.load_library('c', darwin='/usr/lib/libc.dylib')
-    _c.usleep.argtypes = [ctypes.c_ulong]
-
-    class _ClockBase(object):
-        def sleep(self, microseconds):
-            _c.usleep(int(microseconds))
 
-    _default_time_function = time.time
+    class _timespec(ctypes.Structure):
+        _fields_ = [
+            ('tv_sec', ctypes.c_long),
+            ('tv_nsec', ctypes.c_long),
+        ]
+
+    _CLOCK_MONOTONIC = 1    # time.h
+    _TIMER_ABSTIME = 1      # time.h
+    _EINTR = 4              # errno.h
+
+    try:
+        _c.clock_gettime.argtypes = [ctypes.c_int,
+                                     ctypes.POINTER(_timespec)]
+        _c.clock_nanosleep.argtypes = [ctypes.c_int, ctypes.c_int,
+                                       ctypes.POINTER(_timespec),
+                                       ctypes.POINTER(_timespec)]
+        _c.clock_nanosleep.restype = ctypes.c_int
+        _have_clock_nanosleep = True
+    except AttributeError:
+        # Not provided by this libc (e.g. older Mac OS X); fall back to
+        # the deprecated usleep, which is limited to sleeps under 1 second
+        # and drifts when interrupted by signals.
+        _c.usleep.argtypes = [ctypes.c_ulong]
+        _have_clock_nanosleep = False
+
+    if _have_clock_nanosleep:
+        class _ClockBase(object):
+            def sleep(self, microseconds):
+                # Convert the relative sleep into an absolute deadline on
+                # CLOCK_MONOTONIC.  TIMER_ABSTIME means a signal
+                # interruption can simply re-arm the same deadline with no
+                # accumulated drift.
+                deadline = _timespec()
+                _c.clock_gettime(_CLOCK_MONOTONIC, ctypes.byref(deadline))
+                nsec = deadline.tv_nsec + int(microseconds * 1000)
+                deadline.tv_sec += nsec // 1000000000
+                deadline.tv_nsec = nsec % 1000000000
+                while _c.clock_nanosleep(_CLOCK_MONOTONIC, _TIMER_ABSTIME,
+                                         ctypes.byref(deadline),
+                                         None) == _EINTR:
+                    pass
+    else:
+        class _ClockBase(object):
+            def sleep(self, microseconds):
+                _c.usleep(int(microseconds))
+
+    # See note on the win32 branch; fall back to the wall clock on older
+    # Pythons without perf_counter.
+    _default_time_function = getattr(time, 'perf_counter', time.time)
+
+def _bind_callback(func, args, kwargs):
+    '''Pre-bind a scheduled callback so the per-tick dispatch is a plain
+    bound(dt) call whenever possible.
+
+    Positional arguments must follow dt and therefore cannot be
+    pre-bound; for those the dispatch loops fall back to the splat call
+    and this returns None.
+    '''
+    if args:
+        return None
+    if kwargs:
+        return partial(func, **kwargs)
+    return func
 
 class _ScheduledItem(object):
-    __slots__ = ['func', 'args', 'kwargs']
+    __slots__ = ['func', 'args', 'kwargs', 'cancelled', 'bound']
     def __init__(self, func, args, kwargs):
         self.func = func
         self.args = args
         self.kwargs = kwargs
+        self.cancelled = False
+        self.bound = _bind_callback(func, args, kwargs)
 
 class _ScheduledIntervalItem(object):
-    __slots__ = ['func', 'interval', 'last_ts', 'next_ts', 
-                 'args', 'kwargs']
+    __slots__ = ['func', 'interval', 'last_ts', 'next_ts',
+                 'args', 'kwargs', 'cancelled', 'bound']
     def __init__(self, func, interval, last_ts, next_ts, args, kwargs):
         self.func = func
         self.interval = interval
@@ -192,12 +287,8 @@ class _ScheduledIntervalItem(object):
         self.next_ts = next_ts
         self.args = args
         self.kwargs = kwargs
-
-def _dummy_schedule_func(*args, **kwargs):
-    '''Dummy function that does nothing, placed onto zombie scheduled items
-    to ensure they have no side effect if already queued inside tick() method.
-    '''
-    pass
+        self.cancelled = False
+        self.bound = _bind_callback(func, args, kwargs)
 
 class Clock(_ClockBase):
     '''Class for calculating and limiting framerate, and for calling scheduled
@@ -213,19 +304,28 @@ class Clock(_ClockBase):
     MIN_SLEEP = 0.005
 
     #: The amount of time in seconds this clock subtracts from sleep values
-    #: to compensate for lazy operating systems.
+    #: to compensate for lazy operating systems.  This is the initial and
+    #: maximum value; the clock tightens it at runtime as it observes how
+    #: promptly the OS sleep primitive actually wakes up.
     SLEEP_UNDERSHOOT = MIN_SLEEP - 0.001
 
+    #: The remaining time in seconds below which the clock busy-waits for
+    #: the frame deadline rather than asking the kernel to sleep; under
+    #: this threshold kernel timers are themselves imprecise.
+    BUSY_WAIT_TAIL = 0.0001
+
     # List of functions to call every tick.
     _schedule_items = None
 
-    # List of schedule interval items kept in sort order.
+    # Min-heap of (next_ts, id, item) entries for interval items, so the
+    # earliest item can be peeked in O(1) and insertion is O(log n).
     _schedule_interval_items = None
 
     # If True, a sleep(0) is inserted on every tick.   
     _force_sleep = False
 
-    def __init__(self, fps_limit=None, time_function=_default_time_function):
+    def __init__(self, fps_limit=None, time_function=_default_time_function,
+                 tolerance=None):
         '''Initialise a Clock, with optional framerate limit and custom
         time function.
 
@@ -234,23 +334,52 @@ class Clock(_ClockBase):
                 If not None, the maximum allowable framerate.  Defaults
                 to None.  Deprecated in pyglet 1.2.
             `time_function` : function
-                Function to return the elapsed time of the application, 
-                in seconds.  Defaults to time.time, but can be replaced
-                to allow for easy time dilation effects or game pausing.
+                Function to return the elapsed time of the application,
+                in seconds.  Defaults to time.perf_counter where available
+                (otherwise time.time), but can be replaced to allow for
+                easy time dilation effects or game pausing.
+            `tolerance` : float
+                Minimum sleep duration, in seconds, used when framerate
+                limiting; shorter waits are coalesced into busy-waiting.
+                Defaults to None, which uses the battery-friendly
+                `MIN_SLEEP` threshold.  Set to 0 to disable coalescing
+                entirely and rely on the high-resolution OS timers for
+                the tightest possible frame pacing.
 
         '''
 
         super(Clock, self).__init__()
         self.time = time_function
+        self.tolerance = tolerance
         self.next_ts = self.time()
         self.last_ts = None
-        self.times = []
+        self.times = deque()
+        self.cumulative_time = 0
 
         self.set_fps_limit(fps_limit)
-        self.cumulative_time = 0
 
         self._schedule_items = []
         self._schedule_interval_items = []
+        self._firing_interval_items = []
+
+        # Index of every live scheduled item by func, so unschedule is a
+        # dict pop instead of a scan over both schedules.
+        self._scheduled_funcs = {}
+
+        # Number of cancelled items still sitting in _schedule_items; they
+        # are swept out in one pass on the next tick.
+        self._cancelled_schedule_items = 0
+
+        # Monotonically increasing tie-breaker for heap entries, so items
+        # scheduled for the same timestamp fire in FIFO order and the heap
+        # never has to compare two items directly.
+        self._schedule_id = itertools.count().next
+
+        # Exponentially-weighted moving average of how much later than
+        # requested the OS wakes us from sleep().  Starts at the
+        # conservative fixed undershoot and converges towards the actual
+        # jitter of the platform timer, so precise timers busy-wait less.
+        self._sleep_overshoot = self.SLEEP_UNDERSHOOT
 
     def update_time(self):
         '''Get the elapsed time since the last call to `update_time`.
@@ -269,9 +398,12 @@ class Clock(_ClockBase):
             delta_t = 0
         else:
             delta_t = ts - self.last_ts
-            self.times.insert(0, delta_t)
-            if len(self.times) > self.window_size:
-                self.cumulative_time -= self.times.pop()
+            times = self.times
+            if len(times) == times.maxlen:
+                # Evict the oldest sample ourselves so the running sum
+                # stays consistent (appendleft would discard it silently).
+                self.cumulative_time -= times.pop()
+            times.appendleft(delta_t)
         self.cumulative_time += delta_t
         self.last_ts = ts
 
@@ -291,24 +423,85 @@ class Clock(_ClockBase):
         :rtype: bool
         :return: True if any functions were called, otherwise False.
         '''
+        # Fast path: nothing scheduled at all, which is the common case
+        # for applications driving their own updates from on_draw.
+        if not self._schedule_items and not self._schedule_interval_items:
+            return False
+
         ts = self.last_ts
         result = False
 
-        # Call functions scheduled for every frame  
+        # Sweep out items cancelled since the last tick in one pass, so
+        # several unschedule calls cost at most one list rebuild.
+        if self._cancelled_schedule_items:
+            self._schedule_items = [item for item in self._schedule_items \
+                                         if not item.cancelled]
+            self._cancelled_schedule_items = 0
+
+        # Call functions scheduled for every frame
         # Dupe list just in case one of the items unchedules itself
         for item in list(self._schedule_items):
+            if item.cancelled:
+                continue
             result = True
-            item.func(dt, *item.args, **item.kwargs)
+            bound = item.bound
+            if bound is not None:
+                bound(dt)
+            else:
+                item.func(dt, *item.args, **item.kwargs)
+
+        # Dispatch interval items only when the earliest one is actually
+        # due; an idle frame then costs just this one comparison.
+        interval_items = self._schedule_interval_items
+        if interval_items and interval_items[0][0] <= ts:
+            result = self._dispatch_interval_items(ts) or result
+
+        return result
+
+    def _dispatch_interval_items(self, ts):
+        '''Call scheduled interval functions that are due at `ts` and
+        reschedule the repeating ones.
+
+        :rtype: bool
+        :return: True if any functions were called, otherwise False.
+        '''
+        result = False
+
+        # Pop everything that is due off the heap before dispatching, so
+        # that items scheduled from within a callback cannot fire until the
+        # next tick (matching the behaviour of the old sorted-list copy).
+        interval_items = self._schedule_interval_items
+        fired = self._firing_interval_items
+        while interval_items and interval_items[0][0] <= ts:
+            item = heapq.heappop(interval_items)[2]
+            if not item.cancelled:
+                fired.append(item)
+
+        # Call all due interval functions and reschedule for the future.
+        repush = []
+        done = 0
+        try:
+            for item in fired:
+                if item.cancelled:
+                    # Unscheduled while it was queued; forget it.
+                    done += 1
+                    continue
+                result = True
+                bound = item.bound
+                if bound is not None:
+                    bound(ts - item.last_ts)
+                else:
+                    item.func(ts - item.last_ts, *item.args, **item.kwargs)
+                if not item.interval:
+                    # Finished one-shots are simply not rescheduled.
+                    self._forget_item(item)
+                    done += 1
+                    continue
+                if item.cancelled:
+                    # Unscheduled itself during the callback.
+                    done += 1
+                    continue
 
-        # Call all scheduled interval functions and reschedule for future.
-        need_resort = False
-        # Dupe list just in case one of the items unchedules itself
-        for item in list(self._schedule_interval_items):
-            if item.next_ts > ts:
-                break
-            result = True
-            item.func(ts - item.last_ts, *item.args, **item.kwargs)
-            if item.interval:
                 # Try to keep timing regular, even if overslept this time;
                 # but don't schedule in the past (which could lead to
                 # infinitely-worsing error).
@@ -319,25 +512,35 @@ class Clock(_ClockBase):
                         # Only missed by a little bit, keep the same schedule
                         item.next_ts = ts + item.interval
                     else:
-                        # Missed by heaps, do a soft reschedule to avoid 
+                        # Missed by heaps, do a soft reschedule to avoid
                         # lumping everything together.
-                        item.next_ts = self._get_soft_next_ts(ts, item.interval)
+                        item.next_ts = self._get_soft_next_ts(ts,
+                                                              item.interval)
                         # Fake last_ts to avoid repeatedly over-scheduling in
                         # future.  Unfortunately means the next reported dt is
                         # incorrect (looks like interval but actually isn't).
                         item.last_ts = item.next_ts - item.interval
-                need_resort = True
-            else:
-                item.next_ts = None
-
-        # Remove finished one-shots.
-        self._schedule_interval_items = \
-            [item for item in self._schedule_interval_items \
-             if item.next_ts is not None]
-
-        if need_resort:
-            # TODO bubble up changed items might be faster
-            self._schedule_interval_items.sort(key=lambda a: a.next_ts)
+                repush.append((item.next_ts, self._schedule_id(), item))
+                done += 1
+        finally:
+            # An exception from a callback must not strand the remaining
+            # due items in the shared firing list: everything not fully
+            # processed (including the item that raised) goes back on the
+            # heap at its old timestamp to run again next tick, matching
+            # the pre-heap dispatch.
+            for item in fired[done:]:
+                if not item.cancelled:
+                    repush.append((item.next_ts, self._schedule_id(), item))
+            del fired[:]
+
+            # Re-arm all repeating items in one pass: a single O(n)
+            # heapify is cheaper than k individual O(log n) pushes once
+            # several items fire on the same tick.
+            if len(repush) == 1:
+                heapq.heappush(interval_items, repush[0])
+            elif repush:
+                interval_items.extend(repush)
+                heapq.heapify(interval_items)
 
         return result
 
@@ -380,25 +583,73 @@ class Clock(_ClockBase):
         This method uses several heuristics to determine whether to
         sleep or busy-wait (or both).
         '''
-        ts = self.time()
+        # Bind everything used repeatedly to locals; the busy-wait below
+        # runs thousands of iterations per frame.
+        _time = self.time
+        if self.tolerance is None:
+            min_sleep = self.MIN_SLEEP
+        else:
+            # An explicit tolerance overrides the sleep-coalescing
+            # threshold; zero means every wait goes to the OS timer.
+            min_sleep = self.tolerance
+        undershoot = self._get_sleep_undershoot()
+
+        ts = _time()
         # Sleep to just before the desired time
         sleeptime = self.get_sleep_time(False)
-        while sleeptime - self.SLEEP_UNDERSHOOT > self.MIN_SLEEP:
-            self.sleep(1000000 * (sleeptime - self.SLEEP_UNDERSHOOT))
+        while sleeptime - undershoot > min_sleep:
+            expected_wake = _time() + sleeptime - undershoot
+            self.sleep(1000000 * (sleeptime - undershoot))
+            # Track how late the OS actually woke us; on precise timers
+            # this converges well below the fixed undershoot, shrinking
+            # the busy-wait tail.
+            overshoot = _time() - expected_wake
+            self._sleep_overshoot += \
+                (overshoot - self._sleep_overshoot) * 0.1
+            undershoot = self._get_sleep_undershoot()
             sleeptime = self.get_sleep_time(False)
 
+        # Let the kernel timer take the wait down to the last fraction of
+        # a millisecond instead of burning CPU on the whole tail -- but
+        # only while the measured wake-up latency leaves room before the
+        # deadline.  On the coarse fallback timers (CreateWaitableTimerA,
+        # usleep) a tail sleep can overshoot by a full timer quantum, so
+        # there the whole tail falls through to the busy-wait, which hits
+        # the deadline exactly as the pre-timer code did.
+        busy_wait_tail = self.BUSY_WAIT_TAIL
+        next_ts = self.next_ts
+        sleeptime = next_ts - _time()
+        while sleeptime - self._sleep_overshoot * 1.5 > busy_wait_tail:
+            expected_wake = _time() + sleeptime - busy_wait_tail
+            self.sleep(1000000 * (sleeptime - busy_wait_tail))
+            overshoot = _time() - expected_wake
+            self._sleep_overshoot += \
+                (overshoot - self._sleep_overshoot) * 0.1
+            sleeptime = next_ts - _time()
+
         # Busy-loop CPU to get closest to the mark
-        sleeptime = self.next_ts - self.time()
         while sleeptime > 0:
-            sleeptime = self.next_ts - self.time()
+            sleeptime = next_ts - _time()
 
-        if sleeptime < -2 * self.period_limit:
+        period_limit = self.period_limit
+        if sleeptime < -2 * period_limit:
             # Missed the time by a long shot, let's reset the clock
             # print >> sys.stderr, 'Step %f' % -sleeptime
-            self.next_ts = ts + 2 * self.period_limit
+            self.next_ts = ts + 2 * period_limit
         else:
             # Otherwise keep the clock steady
-            self.next_ts = self.next_ts + self.period_limit
+            self.next_ts = next_ts + period_limit
+
+    def _get_sleep_undershoot(self):
+        '''Get the effective sleep undershoot: 1.5x the observed wake-up
+        jitter, clamped between zero and the conservative fixed default.
+        '''
+        undershoot = self._sleep_overshoot * 1.5
+        if undershoot < 0.:
+            return 0.
+        if undershoot > self.SLEEP_UNDERSHOOT:
+            return self.SLEEP_UNDERSHOOT
+        return undershoot
 
     def get_sleep_time(self, sleep_idle):
         '''Get the time until the next item is scheduled.
@@ -435,15 +686,29 @@ class Clock(_ClockBase):
                 return 0.
             else:
                 wake_time = self.next_ts
-                if self._schedule_interval_items:
-                    wake_time = min(wake_time,
-                                    self._schedule_interval_items[0].next_ts)
+                interval_ts = self._next_interval_ts()
+                if interval_ts is not None:
+                    wake_time = min(wake_time, interval_ts)
                 return max(wake_time - self.time(), 0.)
 
-        if self._schedule_interval_items:
-            return max(self._schedule_interval_items[0].next_ts - self.time(),
-                       0)
-            
+        interval_ts = self._next_interval_ts()
+        if interval_ts is not None:
+            return max(interval_ts - self.time(), 0)
+
+        return None
+
+    def _next_interval_ts(self):
+        '''Get the timestamp of the earliest live interval item, or None
+        if nothing is scheduled.
+
+        Cancelled entries at the head of the heap are discarded on the way.
+        '''
+        interval_items = self._schedule_interval_items
+        while interval_items:
+            entry = interval_items[0]
+            if not entry[2].cancelled:
+                return entry[0]
+            heapq.heappop(interval_items)
         return None
 
     def set_fps_limit(self, fps_limit):
@@ -464,8 +729,20 @@ class Clock(_ClockBase):
             self.period_limit = None
         else:
             self.period_limit = 1. / fps_limit
+        # Cache the limit itself so get_fps_limit needs no division.
+        self._fps_limit = fps_limit or 0
         self.window_size = fps_limit or 60
 
+        # Resize the FPS sampling window, keeping the most recent samples
+        # and the running sum consistent.  appendleft keeps O(1) inserts
+        # at the head, where a plain list would memmove every frame.
+        # Fractional limits below 1 fps must still keep one sample, or
+        # the eviction in update_time would pop from an empty deque.
+        window = max(1, int(self.window_size))
+        kept = list(self.times)[:window]
+        self.times = deque(kept, window)
+        self.cumulative_time = sum(kept)
+
     def get_fps_limit(self):
         '''Get the framerate limit.
 
@@ -473,10 +750,7 @@ class Clock(_ClockBase):
         :return: The framerate limit previously set in the constructor or
             `set_fps_limit`, or None if no limit was set.
         '''
-        if self.period_limit:
-            return 1. / self.period_limit
-        else:
-            return 0
+        return self._fps_limit
 
     def get_fps(self):
         '''Get the average FPS of recent history.  
@@ -508,18 +782,29 @@ class Clock(_ClockBase):
         '''
         item = _ScheduledItem(func, args, kwargs)
         self._schedule_items.append(item)
+        self._scheduled_funcs.setdefault(func, []).append(item)
 
     def _schedule_item(self, func, last_ts, next_ts, interval, *args, **kwargs):
         item = _ScheduledIntervalItem(
             func, interval, last_ts, next_ts, args, kwargs)
 
-        # Insert in sort order
-        for i, other in enumerate(self._schedule_interval_items):
-            if other.next_ts is not None and other.next_ts > next_ts:
-                self._schedule_interval_items.insert(i, item)
-                break
-        else:
-            self._schedule_interval_items.append(item)
+        # O(log n) heap insert; ties are broken by insertion order.
+        heapq.heappush(self._schedule_interval_items,
+                       (next_ts, self._schedule_id(), item))
+        self._scheduled_funcs.setdefault(func, []).append(item)
+
+    def _forget_item(self, item):
+        '''Drop the func index entry for an item that has finished
+        naturally (i.e. was not cancelled by `unschedule`).
+        '''
+        items = self._scheduled_funcs.get(item.func)
+        if items is not None:
+            try:
+                items.remove(item)
+            except ValueError:
+                pass
+            if not items:
+                del self._scheduled_funcs[item.func]
 
     def schedule_interval(self, func, interval, *args, **kwargs):
         '''Schedule a function to be called every `interval` seconds.
@@ -598,13 +883,11 @@ class Clock(_ClockBase):
             '''Return True if the given time has already got an item
             scheduled nearby.
             '''
-            for item in self._schedule_interval_items:
-                if item.next_ts is None:
-                    pass
-                elif abs(item.next_ts - ts) <= e:
+            # Heap order is not sorted order, so all entries must be
+            # examined.
+            for _, _, item in self._schedule_interval_items:
+                if not item.cancelled and abs(item.next_ts - ts) <= e:
                     return True
-                elif item.next_ts > ts + e:
-                    return False
             return False
 
         # Binary division over interval:
@@ -673,25 +956,18 @@ class Clock(_ClockBase):
                 The function to remove from the schedule.
 
         '''
-        # First replace zombie items' func with a dummy func that does
-        # nothing, in case the list has already been cloned inside tick().
-        # (Fixes issue 326).
-        for item in self._schedule_items:
-            if item.func == func:
-                item.func = _dummy_schedule_func
-
-        for item in self._schedule_interval_items:
-            if item.func == func:
-                item.func = _dummy_schedule_func
-    
-        # Now remove matching items from both schedule lists.
-        self._schedule_items = \
-            [item for item in self._schedule_items \
-                  if item.func is not _dummy_schedule_func]
-
-        self._schedule_interval_items = \
-            [item for item in self._schedule_interval_items \
-                  if item.func is not _dummy_schedule_func]
+        # Every scheduled item is indexed by func, so this is a dict pop
+        # plus a flag per item rather than a scan over both schedules.
+        # Marking (rather than removing) also neutralises items already
+        # cloned or popped inside tick(); the dispatch loops check the
+        # flag before calling.  (Fixes issue 326.)
+        items = self._scheduled_funcs.pop(func, None)
+        if items is None:
+            return
+        for item in items:
+            item.cancelled = True
+            if isinstance(item, _ScheduledItem):
+                self._cancelled_schedule_items += 1
 
 # Default clock.
 _default = Clock()
@@ -968,7 +1244,7 @@ def test_clock():
             sys.exit(0) 
 
     set_fps_limit(test_fps)
-    start = time.time()
+    start = _default_time_function()
 
     # Add one because first frame has no update interval.
     n_frames = int(test_seconds * test_fps + 1)
@@ -978,7 +1254,7 @@ def test_clock():
         tick()
         if show_fps:
             print get_fps()
-    total_time = time.time() - start
+    total_time = _default_time_function() - start
     total_error = total_time - test_seconds
     print 'Total clock error: %f secs' % total_error
     print 'Total clock error / secs: %f secs/secs' % \
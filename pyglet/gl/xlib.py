@@ -167,15 +167,25 @@ class XlibCanvasConfig13(BaseXlibCanvasConfig):
 
     def __init__(self, canvas, glx_info, fbconfig, config):
         super(XlibCanvasConfig13, self).__init__(canvas, glx_info, config)
-        x_display = canvas.display._display
-
         self._fbconfig = fbconfig
-        for name, attr in self.attribute_ids.items():
-            value = c_int()
-            result = glx.glXGetFBConfigAttrib(
-               x_display, self._fbconfig, attr, byref(value))
-            if result >= 0:
-                setattr(self, name, value.value)
+
+    def __getattr__(self, name):
+        # Attribute values are queried from GLX on first use rather than
+        # eagerly in __init__: glXChooseFBConfig commonly returns dozens
+        # of configs, and querying every attribute of every config is
+        # thousands of potential round-trips at startup, almost all of
+        # them never looked at.  Results are cached on the instance, so
+        # each attribute is queried at most once.
+        attr = self.attribute_ids.get(name)
+        if attr is None:
+            raise AttributeError(name)
+        value = c_int()
+        result = glx.glXGetFBConfigAttrib(
+            self.canvas.display._display, self._fbconfig, attr, byref(value))
+        if result < 0:
+            raise AttributeError(name)
+        setattr(self, name, value.value)
+        return value.value
 
     def get_visual_info(self):
         return glx.glXGetVisualFromFBConfig(
@@ -36,6 +36,7 @@ __docformat__ = 'restructuredtext'
 __version__ = '$Id$'
 
 from ctypes import *
+import select
 import unicodedata
 import warnings
 
@@ -93,6 +94,58 @@ _motion_map = {
     (key.DELETE, False):    key.MOTION_DELETE,
 }
 
+# Bind the Xlib entry points used on the event hot path to module-level
+# names.  The generated wrapper already declares argtypes/restype for all
+# of these (so ctypes does no per-call argument guessing); binding them
+# here removes the remaining module attribute lookup per call.
+_XEventsQueued = xlib.XEventsQueued
+_XNextEvent = xlib.XNextEvent
+_XPeekEvent = xlib.XPeekEvent
+_XFilterEvent = xlib.XFilterEvent
+_XLookupString = xlib.XLookupString
+
+# Prebuilt tuple for the per-event key test in dispatch_events, so the
+# drain loop does not rebuild it (with two attribute lookups) per event.
+_key_event_types = (xlib.KeyPress, xlib.KeyRelease)
+
+# Cache of interned atoms, keyed by (display address, name, only_if_exists).
+# Atoms are fixed for the lifetime of the server connection, so each name
+# costs at most one round-trip; repeat lookups are dict hits.
+_atom_cache = {}
+
+def _intern_atom(display, name, only_if_exists=False):
+    key = (cast(display, c_void_p).value, name, only_if_exists)
+    atom = _atom_cache.get(key)
+    if atom is None:
+        atom = xlib.XInternAtom(display, asbytes(name), only_if_exists)
+        _atom_cache[key] = atom
+    return atom
+
+def _build_modifier_lut():
+    # All the X modifier masks fit in the low byte of the state field, so
+    # the translation to pyglet modifier flags can be a table lookup.
+    lut = []
+    for state in range(256):
+        modifiers = 0
+        if state & xlib.ShiftMask:
+            modifiers |= key.MOD_SHIFT
+        if state & xlib.ControlMask:
+            modifiers |= key.MOD_CTRL
+        if state & xlib.LockMask:
+            modifiers |= key.MOD_CAPSLOCK
+        if state & xlib.Mod1Mask:
+            modifiers |= key.MOD_ALT
+        if state & xlib.Mod2Mask:
+            modifiers |= key.MOD_NUMLOCK
+        if state & xlib.Mod4Mask:
+            modifiers |= key.MOD_WINDOWS
+        if state & xlib.Mod5Mask:
+            modifiers |= key.MOD_SCROLLLOCK
+        lut.append(modifiers)
+    return tuple(lut)
+
+_modifier_lut = _build_modifier_lut()
+
 class XlibException(WindowException):
     '''An X11-specific exception.  This exception is probably a programming
     error in pyglet.'''
@@ -122,7 +175,8 @@ class XlibWindow(BaseWindow):
     _width = 0
     _height = 0             # Last known window size
     _mouse_exclusive_client = None  # x,y of "real" mouse during exclusive
-    _mouse_buttons = [False] * 6 # State of each xlib button
+    _mouse_buttons = 0      # Bitmask of pressed xlib buttons; bit n-1 is
+                            # button n
     _keyboard_exclusive = False
     _active = True
     _applied_mouse_exclusive = False
@@ -135,18 +189,28 @@ class XlibWindow(BaseWindow):
     _current_sync_value = None
     _current_sync_valid = False
 
+    _wm_delete_window = None        # Atoms compared against incoming
+    _net_wm_sync_request = None     # ClientMessage events
+
     _needs_resize = False   # True when resize event has been received but not
                             # dispatched
 
+    #: Maximum number of platform events handled per `dispatch_events` call,
+    #: so that a flood of events (e.g. MotionNotify during a fast drag)
+    #: cannot starve rendering.
+    MAX_EVENTS_PER_FRAME = 64
+
     _default_event_mask = (0x1ffffff 
         & ~xlib.PointerMotionHintMask
         & ~xlib.ResizeRedirectMask
         & ~xlib.SubstructureNotifyMask)
 
     def __init__(self, *args, **kwargs):
-        # Bind event handlers
-        self._event_handlers = {}
-        self._view_event_handlers = {}
+        # Bind event handlers.  X event codes (including extension events)
+        # are always below 128, so a flat list indexed by event type is
+        # used instead of a dict; unknown types hit a None entry.
+        self._event_handlers = [None] * 128
+        self._view_event_handlers = [None] * 128
         for name in self._platform_event_names:
             if not hasattr(self, name):
                 continue
@@ -155,7 +219,14 @@ class XlibWindow(BaseWindow):
                 if hasattr(func, '_view'):
                     self._view_event_handlers[message] = func 
                 else:
-                    self._event_handlers[message] = func 
+                    self._event_handlers[message] = func
+
+        # Reusable event buffers, so the dispatch loop does not construct
+        # a fresh ctypes XEvent per event.  XNextEvent overwrites every
+        # field it uses, so no clearing between events is needed.
+        self._event_buf = xlib.XEvent()
+        self._peek_buf = xlib.XEvent()
+        self._keybuf = create_string_buffer(128)
 
         super(XlibWindow, self).__init__(*args, **kwargs)
         
@@ -263,13 +334,13 @@ class XlibWindow(BaseWindow):
                                   self.config.double_buffer)
 
             # Set supported protocols
-            protocols = []
-            protocols.append(xlib.XInternAtom(self._x_display,
-                                              asbytes('WM_DELETE_WINDOW'), False))
+            self._wm_delete_window = _intern_atom(self._x_display,
+                                                  'WM_DELETE_WINDOW')
+            protocols = [self._wm_delete_window]
             if self._enable_xsync:
-                protocols.append(xlib.XInternAtom(self._x_display,
-                                                  asbytes('_NET_WM_SYNC_REQUEST'),
-                                                  False))
+                self._net_wm_sync_request = _intern_atom(
+                    self._x_display, '_NET_WM_SYNC_REQUEST')
+                protocols.append(self._net_wm_sync_request)
             protocols = (c_ulong * len(protocols))(*protocols)
             xlib.XSetWMProtocols(self._x_display, self._window,
                                  protocols, len(protocols))
@@ -279,8 +350,8 @@ class XlibWindow(BaseWindow):
                 value = xsync.XSyncValue()
                 self._sync_counter = xlib.XID(
                     xsync.XSyncCreateCounter(self._x_display, value))
-                atom = xlib.XInternAtom(self._x_display,
-                                        asbytes('_NET_WM_SYNC_REQUEST_COUNTER'), False)
+                atom = _intern_atom(self._x_display,
+                                    '_NET_WM_SYNC_REQUEST_COUNTER')
                 ptr = pointer(self._sync_counter)
 
                 xlib.XChangeProperty(self._x_display, self._window,
@@ -328,7 +399,7 @@ class XlibWindow(BaseWindow):
             mwmhints = mwmhints_t()
             mwmhints.flags = MWM_HINTS_DECORATIONS
             mwmhints.decorations = 0
-            name = xlib.XInternAtom(self._x_display, asbytes('_MOTIF_WM_HINTS'), False)
+            name = _intern_atom(self._x_display, '_MOTIF_WM_HINTS')
             xlib.XChangeProperty(self._x_display, self._window,
                 name, name, 32, xlib.PropModeReplace, 
                 cast(pointer(mwmhints), POINTER(c_ubyte)),
@@ -380,21 +451,30 @@ class XlibWindow(BaseWindow):
         self._applied_mouse_exclusive = None
         self._update_exclusivity()
 
+        # All the one-way requests above (resize, attributes, properties,
+        # hints) sit batched in Xlib's output buffer; push them out in one
+        # round trip so the window is fully set up server-side before this
+        # returns, rather than whenever the buffer next happens to flush.
+        xlib.XSync(self._x_display, False)
+
     def _map(self):
         if self._mapped:
             return
 
-        # Map the window, wait for map event before continuing.
+        # Map the window, wait for map event before continuing.  The
+        # default event mask already includes StructureNotifyMask, so one
+        # XSelectInput covers both the wait and normal operation;
+        # XWindowEvent pulls only structure events off the queue while
+        # waiting, so no input events are discarded.
         xlib.XSelectInput(
-            self._x_display, self._window, xlib.StructureNotifyMask)
+            self._x_display, self._window, self._default_event_mask)
         xlib.XMapRaised(self._x_display, self._window)
         e = xlib.XEvent()
         while True:
-            xlib.XNextEvent(self._x_display, e)
+            xlib.XWindowEvent(self._x_display, self._window,
+                              xlib.StructureNotifyMask, byref(e))
             if e.type == xlib.MapNotify:
                 break
-        xlib.XSelectInput(
-            self._x_display, self._window, self._default_event_mask)
         self._mapped = True
 
         if self._override_redirect:
@@ -410,16 +490,15 @@ class XlibWindow(BaseWindow):
             return
 
         xlib.XSelectInput(
-            self._x_display, self._window, xlib.StructureNotifyMask)
+            self._x_display, self._window, self._default_event_mask)
         xlib.XUnmapWindow(self._x_display, self._window)
         e = xlib.XEvent()
         while True:
-            xlib.XNextEvent(self._x_display, e)
+            xlib.XWindowEvent(self._x_display, self._window,
+                              xlib.StructureNotifyMask, byref(e))
             if e.type == xlib.UnmapNotify:
                 break
 
-        xlib.XSelectInput(
-            self._x_display, self._window, self._default_event_mask)
         self._mapped = False
 
     def _get_root(self):
@@ -469,10 +548,16 @@ class XlibWindow(BaseWindow):
         if caption is None:
             caption = ''
         self._caption = caption
-        self._set_text_property('WM_NAME', caption, allow_utf8=False)
-        self._set_text_property('WM_ICON_NAME', caption, allow_utf8=False)
-        self._set_text_property('_NET_WM_NAME', caption)
-        self._set_text_property('_NET_WM_ICON_NAME', caption)
+        # Only the target atom differs between the four properties, so
+        # encode the caption and build each text property just once.
+        prop_legacy = self._build_text_property(caption, allow_utf8=False)
+        prop_utf8 = self._build_text_property(caption)
+        for name, property in (('WM_NAME', prop_legacy),
+                               ('WM_ICON_NAME', prop_legacy),
+                               ('_NET_WM_NAME', prop_utf8),
+                               ('_NET_WM_ICON_NAME', prop_utf8)):
+            xlib.XSetTextProperty(self._x_display, self._window,
+                byref(property), _intern_atom(self._x_display, name))
 
     def get_caption(self):
         return self._caption
@@ -710,7 +795,7 @@ class XlibWindow(BaseWindow):
             data += s.raw + image.get_data(format, pitch)
         buffer = (c_ubyte * len(data))()
         memmove(buffer, data, len(data))
-        atom = xlib.XInternAtom(self._x_display, asbytes('_NET_WM_ICON'), False)
+        atom = _intern_atom(self._x_display, '_NET_WM_ICON')
         xlib.XChangeProperty(self._x_display, self._window, atom, XA_CARDINAL,
             32, xlib.PropModeReplace, buffer, len(data)//sizeof(c_ulong))
 
@@ -726,16 +811,13 @@ class XlibWindow(BaseWindow):
             hints.max_width, hints.max_height = self._maximum_size
         xlib.XSetWMNormalHints(self._x_display, self._window, byref(hints))
 
-    def _set_text_property(self, name, value, allow_utf8=True):
-        atom = xlib.XInternAtom(self._x_display, asbytes(name), False)
-        if not atom:
-            raise XlibException('Undefined atom "%s"' % name)
+    def _build_text_property(self, value, allow_utf8=True):
         assert type(value) in (str, unicode)
         property = xlib.XTextProperty()
         if _have_utf8 and allow_utf8:
             buf = create_string_buffer(value.encode('utf8'))
             result = xlib.Xutf8TextListToTextProperty(self._x_display,
-                cast(pointer(buf), c_char_p), 1, xlib.XUTF8StringStyle, 
+                cast(pointer(buf), c_char_p), 1, xlib.XUTF8StringStyle,
                 byref(property))
             if result < 0:
                 raise XlibException('Could not create UTF8 text property')
@@ -745,17 +827,23 @@ class XlibWindow(BaseWindow):
                 cast(pointer(buf), c_char_p), 1, byref(property))
             if result < 0:
                 raise XlibException('Could not create text property')
+        # XXX <rj> Xlib doesn't like us freeing property.value
+        return property
+
+    def _set_text_property(self, name, value, allow_utf8=True):
+        atom = _intern_atom(self._x_display, name)
+        if not atom:
+            raise XlibException('Undefined atom "%s"' % name)
+        property = self._build_text_property(value, allow_utf8)
         xlib.XSetTextProperty(self._x_display,
             self._window, byref(property), atom)
-        # XXX <rj> Xlib doesn't like us freeing this
-        #xlib.XFree(property.value)
 
     def _set_atoms_property(self, name, values, mode=xlib.PropModeReplace):
-        name_atom = xlib.XInternAtom(self._x_display, asbytes(name), False)
+        name_atom = _intern_atom(self._x_display, name)
         atoms = []
         for value in values:
-            atoms.append(xlib.XInternAtom(self._x_display, asbytes(value), False))
-        atom_type = xlib.XInternAtom(self._x_display, asbytes('ATOM'), False)
+            atoms.append(_intern_atom(self._x_display, value))
+        atom_type = _intern_atom(self._x_display, 'ATOM')
         if len(atoms):
             atoms_ar = (xlib.Atom * len(atoms))(*atoms)
             xlib.XChangeProperty(self._x_display, self._window,
@@ -766,11 +854,11 @@ class XlibWindow(BaseWindow):
 
     def _set_wm_state(self, *states):
         # Set property
-        net_wm_state = xlib.XInternAtom(self._x_display, asbytes('_NET_WM_STATE'), False)
+        net_wm_state = _intern_atom(self._x_display, '_NET_WM_STATE')
         atoms = []
         for state in states:
-            atoms.append(xlib.XInternAtom(self._x_display, asbytes(state), False))
-        atom_type = xlib.XInternAtom(self._x_display, asbytes('ATOM'), False)
+            atoms.append(_intern_atom(self._x_display, state))
+        atom_type = _intern_atom(self._x_display, 'ATOM')
         if len(atoms):
             atoms_ar = (xlib.Atom * len(atoms))(*atoms)
             xlib.XChangeProperty(self._x_display, self._window,
@@ -799,38 +887,90 @@ class XlibWindow(BaseWindow):
 
         self._allow_dispatch_event = True
 
-        e = xlib.XEvent()
+        e = self._event_buf
 
         # Cache these in case window is closed from an event handler
         _x_display = self._x_display
         _window = self._window
         _view = self._view
+        window_map = self.display._window_map
+
+        # Handler tables for this window, indexed inline below to skip a
+        # dispatch_platform_event* method call per event.
+        event_handlers = self._event_handlers
+        view_event_handlers = self._view_event_handlers
+
+        # Drain the connection's queue in a single pass, routing each event
+        # to its owning window or view, instead of asking the server to scan
+        # the queue once per window with XCheckWindowEvent.  Events for
+        # windows dispatching later are queued on those windows rather than
+        # lost.
+        #
+        # Count events already read from the socket first (QueuedAlready
+        # does no I/O); only when that comes up empty flush and read the
+        # socket, at most once per call.
+        # Constants bound locally for the loop below.
+        QueuedAlready = xlib.QueuedAlready
+        MotionNotify = xlib.MotionNotify
+        MappingNotify = xlib.MappingNotify
+        key_event_types = _key_event_types
+
+        pending = _XEventsQueued(_x_display, QueuedAlready)
+        if not pending:
+            pending = _XEventsQueued(_x_display, xlib.QueuedAfterFlush)
+        count = min(pending, self.MAX_EVENTS_PER_FRAME)
+        peek = self._peek_buf
+        # Handlers may themselves consume queued events (the key
+        # auto-repeat check eats the paired KeyPress), so re-check the
+        # local queue each iteration rather than trusting the count alone;
+        # XNextEvent on a drained queue would block.
+        while count > 0 and _XEventsQueued(_x_display, QueuedAlready):
+            count -= 1
+            _XNextEvent(_x_display, e)
+
+            if e.type == MotionNotify:
+                # Coalesce a run of consecutive motion events on the same
+                # window down to the final position; X11 can queue hundreds
+                # of MotionNotify per frame and intermediate positions are
+                # of no interest.  Only the head of the queue is examined,
+                # so ordering against other event types is preserved.
+                while _XEventsQueued(_x_display, QueuedAlready):
+                    _XPeekEvent(_x_display, peek)
+                    if peek.type != MotionNotify or \
+                            peek.xany.window != e.xany.window:
+                        break
+                    _XNextEvent(_x_display, e)
+                    if count > 0:
+                        count -= 1
+
+            if e.type == MappingNotify:
+                # Not tied to any window; keep Xlib's keycode->keysym
+                # table current so key lookups stay correct after the
+                # keyboard mapping changes.
+                xlib.XRefreshKeyboardMapping(e.xmapping)
+                continue
 
-        # Check for the events specific to this window
-        while xlib.XCheckWindowEvent(_x_display, _window,
-                                     0x1ffffff, byref(e)):
-            # Key events are filtered by the xlib window event
-            # handler so they get a shot at the prefiltered event.
-            if e.xany.type not in (xlib.KeyPress, xlib.KeyRelease):
-                if xlib.XFilterEvent(e, 0):
-                    continue
-            self.dispatch_platform_event(e)
-
-        # Check for the events specific to this view
-        while xlib.XCheckWindowEvent(_x_display, _view,
-                                     0x1ffffff, byref(e)):
             # Key events are filtered by the xlib window event
             # handler so they get a shot at the prefiltered event.
-            if e.xany.type not in (xlib.KeyPress, xlib.KeyRelease):
-                if xlib.XFilterEvent(e, 0):
+            if e.type not in key_event_types:
+                if _XFilterEvent(e, e.xany.window):
                     continue
-            self.dispatch_platform_event_view(e)
+            target = e.xany.window
+            if target == _view:
+                handler = view_event_handlers[e.type & 0x7f]
+                if handler:
+                    handler(e)
+            elif target == _window:
+                if self._applied_mouse_exclusive is None:
+                    self._update_exclusivity()
+                handler = event_handlers[e.type & 0x7f]
+                if handler:
+                    handler(e)
+            else:
+                dispatch = window_map.get(target)
+                if dispatch is not None:
+                    dispatch(e)
 
-        # Generic events for this window (the window close event).
-        while xlib.XCheckTypedWindowEvent(_x_display, _window, 
-                xlib.ClientMessage, byref(e)):
-            self.dispatch_platform_event(e) 
- 
         if self._needs_resize:
             self.dispatch_event('on_resize', self._width, self._height)
             self.dispatch_event('on_expose')
@@ -838,6 +978,28 @@ class XlibWindow(BaseWindow):
 
         self._allow_dispatch_event = False
 
+    def wait_events(self, timeout=None):
+        '''Block until an event is available, then dispatch pending events.
+
+        Unlike `dispatch_events`, which returns immediately whether or not
+        anything is queued, this sleeps in select() on the display
+        connection, so applications driving their own loop need not
+        busy-poll.  The standard pyglet event loop already waits this way
+        (see `pyglet.app.xlib.XlibEventLoop`).
+
+        :Parameters:
+            `timeout` : float
+                Maximum time to wait, in seconds, or ``None`` to wait
+                indefinitely.
+
+        '''
+        if not _XEventsQueued(self._x_display, xlib.QueuedAlready):
+            # Push out any requests that could trigger a reply before
+            # sleeping on the connection.
+            xlib.XFlush(self._x_display)
+            select.select([self.display.fileno()], [], [], timeout)
+        self.dispatch_events()
+
     def dispatch_pending_events(self):
         while self._event_queue:
             EventDispatcher.dispatch_event(self, *self._event_queue.pop(0))
@@ -853,33 +1015,19 @@ class XlibWindow(BaseWindow):
     def dispatch_platform_event(self, e):
         if self._applied_mouse_exclusive is None:
             self._update_exclusivity()
-        event_handler = self._event_handlers.get(e.type)
+        event_handler = self._event_handlers[e.type & 0x7f]
         if event_handler:
             event_handler(e)
 
     def dispatch_platform_event_view(self, e):
-        event_handler = self._view_event_handlers.get(e.type)
+        event_handler = self._view_event_handlers[e.type & 0x7f]
         if event_handler:
             event_handler(e)
 
     @staticmethod
     def _translate_modifiers(state):
-        modifiers = 0
-        if state & xlib.ShiftMask:
-            modifiers |= key.MOD_SHIFT
-        if state & xlib.ControlMask:
-            modifiers |= key.MOD_CTRL
-        if state & xlib.LockMask:
-            modifiers |= key.MOD_CAPSLOCK
-        if state & xlib.Mod1Mask:
-            modifiers |= key.MOD_ALT
-        if state & xlib.Mod2Mask:
-            modifiers |= key.MOD_NUMLOCK
-        if state & xlib.Mod4Mask:
-            modifiers |= key.MOD_WINDOWS
-        if state & xlib.Mod5Mask:
-            modifiers |= key.MOD_SCROLLLOCK
-        return modifiers
+        # Buttons and other non-modifier bits live above the low byte.
+        return _modifier_lut[state & 0xff]
 
     # Event handlers
     '''
@@ -898,23 +1046,26 @@ class XlibWindow(BaseWindow):
     def _event_text_symbol(self, ev):
         text = None
         symbol = xlib.KeySym()
-        buffer = create_string_buffer(128)
+        xkey = ev.xkey
+        # Reused between events; only the count bytes the lookup reports
+        # are ever read back, so stale contents are harmless.
+        buffer = self._keybuf
 
         # Look up raw keysym before XIM filters it (default for keypress and
         # keyrelease)
-        count = xlib.XLookupString(ev.xkey,
-                                   buffer, len(buffer) - 1,
-                                   byref(symbol), None)
+        count = _XLookupString(xkey,
+                               buffer, len(buffer) - 1,
+                               byref(symbol), None)
 
         # Give XIM a shot
-        filtered = xlib.XFilterEvent(ev, ev.xany.window)
+        filtered = _XFilterEvent(ev, ev.xany.window)
 
         if ev.type == xlib.KeyPress and not filtered:
             status = c_int()
             if _have_utf8:
                 encoding = 'utf8'
                 count = xlib.Xutf8LookupString(self._x_ic,
-                                               ev.xkey,
+                                               xkey,
                                                buffer, len(buffer) - 1,
                                                byref(symbol), byref(status))
                 if status.value == xlib.XBufferOverflow:
@@ -922,41 +1073,45 @@ class XlibWindow(BaseWindow):
 
             else:
                 encoding = 'ascii'
-                count = xlib.XLookupString(ev.xkey,
-                                           buffer, len(buffer) - 1,
-                                           byref(symbol), None)
+                count = _XLookupString(xkey,
+                                       buffer, len(buffer) - 1,
+                                       byref(symbol), None)
                 if count:
                     status.value = xlib.XLookupBoth
 
             if status.value & (xlib.XLookupChars | xlib.XLookupBoth):
-                text = buffer.value[:count].decode(encoding)
+                text = buffer.raw[:count].decode(encoding)
 
             # Don't treat Unicode command codepoints as text, except Return.
-            if text and unicodedata.category(text) == 'Cc' and text != '\r':
-                text = None
+            # A single printable-ASCII character -- by far the common case
+            # -- can never be a command codepoint, so skip the unicodedata
+            # call for it.
+            if text and not (len(text) == 1 and u' ' <= text < u'\x7f'):
+                if unicodedata.category(text) == 'Cc' and text != '\r':
+                    text = None
 
         symbol = symbol.value
 
         # If the event is a XIM filtered event, the keysym will be virtual
         # (e.g., aacute instead of A after a dead key).  Drop it, we don't
         # want these kind of key events.
-        if ev.xkey.keycode == 0 and not filtered:
+        if xkey.keycode == 0 and not filtered:
             symbol = None
 
         # pyglet.self.key keysymbols are identical to X11 keysymbols, no
         # need to map the keysymbol.  For keysyms outside the pyglet set, map
         # raw key code to a user key.
-        if symbol and symbol not in key._key_names and ev.xkey.keycode:
+        if symbol and symbol not in key._key_names and xkey.keycode:
             # Issue 353: Symbol is uppercase when shift key held down.
             try:
                 symbol = ord(unichr(symbol).lower())
             except ValueError:
                 # Not a valid unichr, use the keycode
-                symbol = key.user_key(ev.xkey.keycode) 
+                symbol = key.user_key(xkey.keycode)
             else:
                 # If still not recognised, use the keycode
                 if symbol not in key._key_names:
-                    symbol = key.user_key(ev.xkey.keycode)
+                    symbol = key.user_key(xkey.keycode)
 
         if filtered:
             # The event was filtered, text must be ignored, but the symbol is
@@ -976,22 +1131,20 @@ class XlibWindow(BaseWindow):
     @XlibEventHandler(xlib.KeyRelease)
     def _event_key_view(self, ev):
         if ev.type == xlib.KeyRelease:
-            # Look in the queue for a matching KeyPress with same timestamp,
-            # indicating an auto-repeat rather than actual key event.
-            saved = []
-            while True:
+            # An auto-repeat arrives as a KeyRelease immediately followed
+            # by a KeyPress with the same keycode.  Peek at the head of
+            # the queue; anything other than the matching press is left in
+            # place, so no save-and-push-back of unrelated events is
+            # needed.
+            if _XEventsQueued(self._x_display, xlib.QueuedAfterReading):
                 auto_event = xlib.XEvent()
-                result = xlib.XCheckWindowEvent(self._x_display,
-                    self._window, xlib.KeyPress|xlib.KeyRelease, 
-                    byref(auto_event))
-                if not result:
-                    break
-                saved.append(auto_event)
-                if auto_event.type == xlib.KeyRelease:
-                    # just save this off for restoration back to the queue
-                    continue
-                if ev.xkey.keycode == auto_event.xkey.keycode:
-                    # Found a key repeat: dispatch EVENT_TEXT* event
+                _XPeekEvent(self._x_display, auto_event)
+                if auto_event.type == xlib.KeyPress and \
+                        auto_event.xkey.window == ev.xkey.window and \
+                        auto_event.xkey.keycode == ev.xkey.keycode:
+                    # Found a key repeat: consume the press and dispatch
+                    # EVENT_TEXT* event only.
+                    _XNextEvent(self._x_display, auto_event)
                     text, symbol = self._event_text_symbol(auto_event)
                     modifiers = self._translate_modifiers(ev.xkey.state)
                     modifiers_ctrl = modifiers & (key.MOD_CTRL | key.MOD_ALT)
@@ -1004,18 +1157,7 @@ class XlibWindow(BaseWindow):
                             self.dispatch_event('on_text_motion', motion)
                     elif text and not modifiers_ctrl:
                         self.dispatch_event('on_text', text)
-
-                    ditched = saved.pop()
-                    for auto_event in reversed(saved):
-                        xlib.XPutBackEvent(self._x_display, byref(auto_event))
                     return
-                else:
-                    # Key code of press did not match, therefore no repeating
-                    # is going on, stop searching.
-                    break
-            # Whoops, put the events back, it's for real.
-            for auto_event in reversed(saved):
-                xlib.XPutBackEvent(self._x_display, byref(auto_event))
 
         text, symbol = self._event_text_symbol(ev)
         modifiers = self._translate_modifiers(ev.xkey.state)
@@ -1044,8 +1186,11 @@ class XlibWindow(BaseWindow):
     @ViewEventHandler
     @XlibEventHandler(xlib.MotionNotify)
     def _event_motionnotify_view(self, ev):
-        x = ev.xmotion.x
-        y = self.height - ev.xmotion.y
+        # Pull the union member out once; every xmotion access below would
+        # otherwise re-run the ctypes field descriptor.
+        xmotion = ev.xmotion
+        x = xmotion.x
+        y = self.height - xmotion.y
 
         if self._mouse_in_window:
             dx = x - self._mouse_x
@@ -1054,7 +1199,7 @@ class XlibWindow(BaseWindow):
             dx = dy = 0
 
         if self._applied_mouse_exclusive and \
-           (ev.xmotion.x, ev.xmotion.y) == self._mouse_exclusive_client:
+           (xmotion.x, xmotion.y) == self._mouse_exclusive_client:
             # Ignore events caused by XWarpPointer
             self._mouse_x = x
             self._mouse_y = y
@@ -1074,17 +1219,18 @@ class XlibWindow(BaseWindow):
         self._mouse_y = y
         self._mouse_in_window = True
 
+        state = xmotion.state
         buttons = 0
-        if ev.xmotion.state & xlib.Button1MotionMask:
+        if state & xlib.Button1MotionMask:
             buttons |= mouse.LEFT
-        if ev.xmotion.state & xlib.Button2MotionMask:
+        if state & xlib.Button2MotionMask:
             buttons |= mouse.MIDDLE
-        if ev.xmotion.state & xlib.Button3MotionMask:
+        if state & xlib.Button3MotionMask:
             buttons |= mouse.RIGHT
 
         if buttons:
             # Drag event
-            modifiers = self._translate_modifiers(ev.xmotion.state)
+            modifiers = self._translate_modifiers(state)
             self.dispatch_event('on_mouse_drag',
                 x, y, dx, dy, buttons, modifiers)
         else:
@@ -1095,18 +1241,20 @@ class XlibWindow(BaseWindow):
     def _event_motionnotify(self, ev):
         # Window motion looks for drags that are outside the view but within
         # the window.
+        xmotion = ev.xmotion
+        state = xmotion.state
         buttons = 0
-        if ev.xmotion.state & xlib.Button1MotionMask:
+        if state & xlib.Button1MotionMask:
             buttons |= mouse.LEFT
-        if ev.xmotion.state & xlib.Button2MotionMask:
+        if state & xlib.Button2MotionMask:
             buttons |= mouse.MIDDLE
-        if ev.xmotion.state & xlib.Button3MotionMask:
+        if state & xlib.Button3MotionMask:
             buttons |= mouse.RIGHT
 
         if buttons:
             # Drag event
-            x = ev.xmotion.x - self._view_x
-            y = self._height - (ev.xmotion.y - self._view_y)
+            x = xmotion.x - self._view_x
+            y = self._height - (xmotion.y - self._view_y)
 
             if self._mouse_in_window:
                 dx = x - self._mouse_x
@@ -1116,19 +1264,16 @@ class XlibWindow(BaseWindow):
             self._mouse_x = x
             self._mouse_y = y
 
-            modifiers = self._translate_modifiers(ev.xmotion.state)
+            modifiers = self._translate_modifiers(state)
             self.dispatch_event('on_mouse_drag',
                 x, y, dx, dy, buttons, modifiers)
 
     @XlibEventHandler(xlib.ClientMessage)
     def _event_clientmessage(self, ev):
         atom = ev.xclient.data.l[0]
-        if atom == xlib.XInternAtom(ev.xclient.display,
-                                    asbytes('WM_DELETE_WINDOW'), False):
+        if atom == self._wm_delete_window:
             self.dispatch_event('on_close')
-        elif (self._enable_xsync and 
-              atom == xlib.XInternAtom(ev.xclient.display, 
-                                       asbytes('_NET_WM_SYNC_REQUEST'), False)):
+        elif self._enable_xsync and atom == self._net_wm_sync_request:
             lo = ev.xclient.data.l[2]
             hi = ev.xclient.data.l[3]
             self._current_sync_value = xsync.XSyncValue(hi, lo)
@@ -1148,28 +1293,30 @@ class XlibWindow(BaseWindow):
     @XlibEventHandler(xlib.ButtonPress)
     @XlibEventHandler(xlib.ButtonRelease)
     def _event_button(self, ev):
-        x = ev.xbutton.x
-        y = self.height - ev.xbutton.y
-        button = 1 << (ev.xbutton.button - 1)  # 1, 2, 3 -> 1, 2, 4
-        modifiers = self._translate_modifiers(ev.xbutton.state)
+        xbutton = ev.xbutton
+        raw_button = xbutton.button
+        x = xbutton.x
+        y = self.height - xbutton.y
+        button = 1 << (raw_button - 1)  # 1, 2, 3 -> 1, 2, 4
+        modifiers = self._translate_modifiers(xbutton.state)
         if ev.type == xlib.ButtonPress:
             # override_redirect issue: manually activate this window if
             # fullscreen.
             if self._override_redirect and not self._active:
                 self.activate()
 
-            if ev.xbutton.button == 4:
+            if raw_button == 4:
                 self.dispatch_event('on_mouse_scroll', x, y, 0, 1)
-            elif ev.xbutton.button == 5:
+            elif raw_button == 5:
                 self.dispatch_event('on_mouse_scroll', x, y, 0, -1)
-            elif ev.xbutton.button < len(self._mouse_buttons):
-                self._mouse_buttons[ev.xbutton.button] = True
-                self.dispatch_event('on_mouse_press', 
+            elif raw_button < 6:
+                self._mouse_buttons |= button
+                self.dispatch_event('on_mouse_press',
                     x, y, button, modifiers)
         else:
-            if ev.xbutton.button < 4:
-                self._mouse_buttons[ev.xbutton.button] = False
-                self.dispatch_event('on_mouse_release', 
+            if raw_button < 4:
+                self._mouse_buttons &= ~button
+                self.dispatch_event('on_mouse_release',
                     x, y, button, modifiers)
 
     @ViewEventHandler
@@ -1186,16 +1333,15 @@ class XlibWindow(BaseWindow):
     def _event_enternotify(self, ev):
         # figure active mouse buttons
         # XXX ignore modifier state?
-        state = ev.xcrossing.state
-        self._mouse_buttons[1] = state & xlib.Button1Mask
-        self._mouse_buttons[2] = state & xlib.Button2Mask
-        self._mouse_buttons[3] = state & xlib.Button3Mask
-        self._mouse_buttons[4] = state & xlib.Button4Mask
-        self._mouse_buttons[5] = state & xlib.Button5Mask
+        xcrossing = ev.xcrossing
+
+        # Button1Mask..Button5Mask occupy bits 8-12 of the state field,
+        # so the whole bitmask is captured in one shift.
+        self._mouse_buttons = (xcrossing.state >> 8) & 0x1f
 
         # mouse position
-        x = self._mouse_x = ev.xcrossing.x
-        y = self._mouse_y = self.height - ev.xcrossing.y
+        x = self._mouse_x = xcrossing.x
+        y = self._mouse_y = self.height - xcrossing.y
         self._mouse_in_window = True
 
         # XXX there may be more we could do here
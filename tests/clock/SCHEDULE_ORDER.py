@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+'''Test that functions scheduled for the same timestamp are dispatched
+in the order they were scheduled.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import time
+import unittest
+
+from pyglet import clock
+
+__noninteractive = True
+
+class SCHEDULE_ORDER(unittest.TestCase):
+    def setUp(self):
+        self.order = []
+
+    def make_callback(self, name):
+        def callback(dt):
+            self.order.append(name)
+        return callback
+
+    def test_once_fifo(self):
+        clock.set_default(clock.Clock())
+        clock.schedule_once(self.make_callback('a'), 0.1)
+        clock.schedule_once(self.make_callback('b'), 0.1)
+        clock.schedule_once(self.make_callback('c'), 0.1)
+
+        time.sleep(0.2)
+        clock.tick()
+        self.assertTrue(self.order == ['a', 'b', 'c'])
+
+    def test_interval_fifo(self):
+        # Repeating items re-armed for the same timestamp must keep their
+        # relative order across frames.
+        clock.set_default(clock.Clock())
+        clock.schedule_interval(self.make_callback('a'), 0.1)
+        clock.schedule_interval(self.make_callback('b'), 0.1)
+        clock.schedule_interval(self.make_callback('c'), 0.1)
+
+        time.sleep(0.15)
+        clock.tick()
+        self.assertTrue(self.order == ['a', 'b', 'c'])
+
+        time.sleep(0.1)
+        clock.tick()
+        self.assertTrue(self.order == ['a', 'b', 'c', 'a', 'b', 'c'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+
+'''Test that a clock with an explicit scheduling tolerance of zero still
+limits the framerate accurately.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import time
+import unittest
+
+from pyglet import clock
+
+__noninteractive = True
+
+class TOLERANCE(unittest.TestCase):
+    def test_tolerance_zero_fps_limit(self):
+        # tolerance=0 disables sleep coalescing, so every wait goes to
+        # the OS timer; the limit must still hold.
+        c = clock.Clock(fps_limit=20, tolerance=0)
+
+        t1 = time.time()
+        c.tick() # One to get it going
+        for i in range(20):
+            c.tick()
+        t2 = time.time()
+        self.assertTrue(abs((t2 - t1) - 1.) < 0.05)
+
+if __name__ == '__main__':
+    unittest.main()
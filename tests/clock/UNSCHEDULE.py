@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+'''Test that unscheduling a function during dispatch takes effect
+immediately, and that an unscheduled function can be scheduled again.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import unittest
+
+from pyglet import clock
+
+__noninteractive = True
+
+class UNSCHEDULE(unittest.TestCase):
+    def setUp(self):
+        self.fired = []
+
+    def make_callback(self, name):
+        def callback(dt):
+            self.fired.append(name)
+        return callback
+
+    def test_unschedule_during_tick(self):
+        # A callback that unschedules a function due later in the same
+        # tick must prevent it from firing (issue 326).
+        clock.set_default(clock.Clock())
+        victim = self.make_callback('victim')
+        def assassin(dt):
+            self.fired.append('assassin')
+            clock.unschedule(victim)
+        clock.schedule(assassin)
+        clock.schedule(victim)
+
+        clock.tick()
+        self.assertTrue(self.fired == ['assassin'])
+
+        clock.tick()
+        self.assertTrue(self.fired == ['assassin', 'assassin'])
+
+    def test_unschedule_interval_during_tick(self):
+        # Same as above for the interval scheduler.
+        clock.set_default(clock.Clock())
+        victim = self.make_callback('victim')
+        def assassin(dt):
+            self.fired.append('assassin')
+            clock.unschedule(victim)
+        clock.schedule_once(assassin, 0)
+        clock.schedule_once(victim, 0)
+
+        clock.tick()
+        self.assertTrue(self.fired == ['assassin'])
+
+        clock.tick()
+        self.assertTrue(self.fired == ['assassin'])
+
+    def test_reschedule(self):
+        clock.set_default(clock.Clock())
+        callback = self.make_callback('callback')
+        clock.schedule(callback)
+        clock.tick()
+        self.assertTrue(self.fired == ['callback'])
+
+        clock.unschedule(callback)
+        clock.tick()
+        self.assertTrue(self.fired == ['callback'])
+
+        clock.schedule(callback)
+        clock.tick()
+        self.assertTrue(self.fired == ['callback', 'callback'])
+
+if __name__ == '__main__':
+    unittest.main()